@@ -20,7 +20,7 @@ Output:
 - Master index with cross-references
 - Quick facts JSON
 - Brand guidelines document
-- Document relationship map
+- Document relationship map (JSON, plus an NDJSON stream)
 - Quality metrics report
 
 Author: AI Assistant
@@ -30,12 +30,78 @@ Version: 2.0 (Production)
 
 import re
 import os
+import atexit
+import sys
+import heapq
 import json
+import pickle
+import time
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import chain
 import hashlib
 
+try:
+    # Optional: pyahocorasick (single-pass multi-keyword search)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Optional: Hyperscan (all noise patterns in one vectorized scan)
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    # Optional: orjson (C JSON encoder) for the JSON reports
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Non-ASCII characters that re.IGNORECASE matches against ASCII letters but
+# whose str.lower() is not that letter (U+212A KELVIN SIGN already lowers to 'k')
+_CASELESS_FOLDS = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+
+def _fold_caseless(text):
+    """Lowercase text so that ASCII literals are found exactly where re.IGNORECASE would find them"""
+    if '\u0130' in text or '\u0131' in text or '\u017f' in text:
+        text = text.translate(_CASELESS_FOLDS)
+    return text.lower()
+
+def _json_bytes(obj, pretty=False):
+    """Serialize obj as UTF-8 JSON with orjson when available, else json
+    
+    Compact by default (machine-read outputs); pretty=True indents by 2
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _write_atomic(path, data):
+    """Write bytes to a temp file next to path, then rename it over path
+    
+    os.replace is atomic, so readers see either the old file or the new one,
+    never a partially written one
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# Fingerprint of this module: cached documents are invalidated whenever the
+# cleaning code (patterns, keywords, structure) changes
+_PIPELINE_FINGERPRINT = hashlib.sha256(Path(__file__).read_bytes()).digest()
+
+
 class HantecProductionCleaner:
     """
     Production-grade data cleaning pipeline for Hantec Markets RAG system
@@ -48,14 +114,48 @@ class HantecProductionCleaner:
     - Comprehensive metadata extraction
     """
     
-    def __init__(self, input_dir="raw_scraped_data", output_dir="data/knowledge_base/website"):
-        self.input_dir = input_dir
-        self.output_dir = output_dir
+    def __init__(self, input_dir="raw_scraped_data", output_dir="data/knowledge_base/website", workers=None, use_cache=True, cache_dir=None):
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        # Processed documents keyed by SHA-256 of file contents, reused across runs.
+        # The cache holds pickles, so it lives outside the published output
+        # folder (default: a hidden sibling of it)
+        if not use_cache:
+            self.cache_dir = None
+        elif cache_dir is not None:
+            self.cache_dir = Path(cache_dir)
+        else:
+            self.cache_dir = self.output_dir.parent / f".{self.output_dir.name}_cache"
+        self._cache_fingerprint = None  # computed on first use, see cache_fingerprint
+        self.workers = workers or os.cpu_count() or 1  # 1 = process files sequentially
+        
+        # Run start: log lines show time elapsed since _t0, documents share _run_ts
+        self._t0 = time.monotonic()
+        self._run_ts = datetime.now().isoformat()
+        # Log lines are written in batches; warnings and errors flush immediately,
+        # and whatever is left is flushed at exit for callers that never reach
+        # run()'s final flush. None means never flush: pool workers hand their
+        # lines back to run() instead
+        self._log_buf = []
+        self._log_flush_every = 64
+        atexit.register(self.flush_log)
         self.processed_docs = []
         self.categories = defaultdict(list)
+        # Fact values across all documents, updated as each document is added
+        self.consolidated_facts = {
+            'leverage_options': set(),
+            'spreads': set(),
+            'commissions': set(),
+            'minimum_deposits': set(),
+            'regulations': set(),
+            'account_types': set(),
+            'platforms': set(),
+            'instruments': set(),
+            'contact_info': set(),
+        }
         
-        # Document relationships for multi-doc queries
-        self.doc_relationships = defaultdict(list)
+        # Document relationships for multi-doc queries (filled in one go at save time)
+        self.doc_relationships = {}
         
         # Quality metrics
         self.metrics = {
@@ -157,6 +257,65 @@ class HantecProductionCleaner:
             'Account Types',
         ]
         
+        # Topic keywords (metadata topic extraction)
+        self.topic_keywords = {
+            'trading': ['trade', 'trading', 'trader', 'market'],
+            'platform': ['mt4', 'mt5', 'metatrader', 'platform', 'app'],
+            'account': ['account', 'registration', 'signup', 'demo', 'live'],
+            'product': ['forex', 'cfd', 'stock', 'crypto', 'commodity', 'index'],
+            'education': ['learn', 'guide', 'tutorial', 'education', 'course'],
+            'regulation': ['fca', 'fsc', 'regulated', 'license', 'compliant'],
+            'payment': ['deposit', 'withdraw', 'payment', 'fund', 'transfer'],
+        }
+        
+        # Category keyword dictionary (expanded)
+        self.category_keywords = {
+            'platforms': {
+                'keywords': ['mt4', 'mt5', 'metatrader', 'webtrader', 'platform', 'app', 'mobile', 'client portal', 'trading terminal'],
+                'weight': 1.0
+            },
+            'products': {
+                'keywords': ['forex', 'cfd', 'commodit', 'indices', 'stock', 'crypto', 'bullion', 'metal', 'currency', 'etf', 'pairs', 'instrument'],
+                'weight': 1.0
+            },
+            'education': {
+                'keywords': ['learn', 'education', 'guide', 'tutorial', 'hub', 'glossary', 'macro', 'risk management', 'strategy', 'indicator', 'analysis'],
+                'weight': 1.0
+            },
+            'accounts': {
+                'keywords': ['account', 'global', 'pro', 'cent', 'demo', 'registration', 'signup', 'live account'],
+                'weight': 1.0
+            },
+            'tools': {
+                'keywords': ['calculator', 'tool', 'calendar', 'economic', 'signal', 'analysis', 'terminal', 'widget'],
+                'weight': 0.8
+            },
+            'about': {
+                'keywords': ['about', 'company', 'contact', 'sponsor', 'atletico', 'fortaleza', 'team', 'office'],
+                'weight': 0.7
+            },
+            'support': {
+                'keywords': ['help', 'faq', 'support', 'question', 'how to', 'how-to'],
+                'weight': 0.9
+            },
+            'legal': {
+                'keywords': ['legal', 'terms', 'condition', 'policy', 'privacy', 'compliance', 'regulation', 'bonus', 'offer'],
+                'weight': 0.8
+            },
+            'funding': {
+                'keywords': ['deposit', 'withdraw', 'funding', 'payment', 'bank', 'transfer', 'method'],
+                'weight': 1.0
+            },
+            'partners': {
+                'keywords': ['partner', 'ib', 'affiliate', 'pamm', 'introducing broker', 'commission'],
+                'weight': 0.8
+            },
+            'blog': {
+                'keywords': ['blog/', 'article', 'news', 'insight'],
+                'weight': 0.5
+            },
+        }
+        
         # Important phrases to NEVER remove
         self.preserve_patterns = [
             r'leverage.*?\d+:\d+',
@@ -167,10 +326,148 @@ class HantecProductionCleaner:
             r'regulated by',
             r'contact.*?(\+?\d{1,3}[-\s]?\d+|[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
         ]
+
+        # Reverse indexes: keyword -> topics / categories that list it
+        self._keyword_topics = defaultdict(list)
+        for topic, keywords in self.topic_keywords.items():
+            for keyword in keywords:
+                self._keyword_topics[keyword].append(topic)
+        self._keyword_categories = defaultdict(list)
+        for category, config in self.category_keywords.items():
+            for keyword in config['keywords']:
+                self._keyword_categories[keyword].append(category)
+        
+        # Precompiled regexes (compiled once, reused for every document)
+        self._noise_re = [re.compile(p, re.IGNORECASE) for p in self.noise_patterns]
+        self._noise_lower = [p.lower() for p in self.noise_patterns]
+        # Lowercased text of noise patterns that are plain ASCII literals (no
+        # regex metacharacters), None for real regexes; lets clean_text skip
+        # the regex with a substring check when the literal is absent
+        self._noise_literals = [
+            None if re.search(r'[.^$*+?{}\[\]\\|()]', p) or not p.isascii() else p.lower()
+            for p in self.noise_patterns
+        ]
+        self._noise_regex_ids = {i for i, literal in enumerate(self._noise_literals) if literal is None}
+        self._build_noise_db()
+        self._preserve_re = [re.compile(p, re.IGNORECASE) for p in self.preserve_patterns]
+
+        # clean_text
+        self._source_line_re = re.compile(r'^SOURCE:.*?\n={80}\n\n', re.MULTILINE)
+        self._header_re = re.compile('|'.join(re.escape(h) for h in self.section_headers))
+        self._newlines_re = re.compile(r'\n{3,}')
+        self._spaces_re = re.compile(r' {2,}')
+        # Trade signal spam, time stamps and repeated dashes/equals, removed in
+        # this order: each deletion can join text into a match for a later one
+        # (e.g. dashes split by a signal tag), so they stay separate passes
+        self._removal_res = [
+            re.compile(r'(PREMIUM|INTRADAY|BUY LIMIT|SELL LIMIT|LIVE TRADE)\s*\n'),
+            re.compile(r'(Entry|Target|Stop|Confidence|Expires)\s*\n', re.IGNORECASE),
+            re.compile(r'To unlock this trade idea.*?account\.', re.DOTALL),
+            re.compile(r'\d+h \d+m'),  # Time stamps
+            re.compile(r'[-]{10,}'),
+            re.compile(r'[=]{10,}(?!\n)'),  # Keep if followed by newline
+        ]
+
+        # extract_metadata / process_file
+        # Patterns without re.IGNORECASE are written in lowercase and run
+        # against the document's case-folded copy (text_lower, see _fold_caseless)
+        self._source_url_re = re.compile(r'SOURCE:\s*(https?://[^\n]+)')
+        self._has_numbers_re = re.compile(r'\d+')
+        self._has_pricing_re = re.compile(r'(\$|commission|spread|fee|cost|charge)')
+        self._has_contact_re = re.compile(r'(email|phone|contact|@|\+\d+)')
+        self._has_regulatory_re = re.compile(r'(fca|fsc|asic|vfsc|regulat|licens|complian)')
+        self._has_tutorial_re = re.compile(r'(how to|step|guide|tutorial|learn)')
+        self._email_re = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+        self._phone_re = re.compile(r'\+?\d{1,3}[-\s]?\d{2,3}[-\s]?\d{3,4}[-\s]?\d{3,4}')
+        self._url_re = re.compile(r'https?://[^\s]+')
+
+        # extract_key_facts
+        self._leverage_re = re.compile(r'(\d+:\d+)\s*leverage')
+        self._spread_re = re.compile(r'spread.*?(\d+\.?\d*)\s*pip')
+        self._commission_re = re.compile(r'commission.*?(\d+\.?\d*)\s*%')
+        self._deposit_re = re.compile(r'minimum deposit.*?\$(\d+)')
+        self._regulation_re = re.compile(r'(fca|fsc|asic|cysec|vfsc|fsa)')
+        # Presence facts: (name, literal terms, confirming regex or None).
+        # The terms ride along in the keyword pass; a regex only runs to check
+        # word boundaries once one of its terms has been found
+        self._account_type_terms = [
+            ('Hantec Global', ('hantec global',), None),
+            ('Hantec Pro', ('hantec pro',), None),
+            ('Hantec Cent', ('hantec cent',), None),
+        ]
+        self._platform_terms = [
+            ('MT4', ('mt4', 'metatrader 4'), re.compile(r'\bmt4\b|metatrader 4')),
+            ('MT5', ('mt5', 'metatrader 5'), re.compile(r'\bmt5\b|metatrader 5')),
+            ('Hantec Social', ('hantec social',), None),
+            ('Mobile App', ('mobile app',), None),
+            ('WebTrader', ('webtrader',), None),
+        ]
+        self._instrument_terms = [
+            ('Forex', ('forex', 'currency pair', 'fx'), None),
+            ('CFDs', ('cfd',), re.compile(r'\bcfd\b')),
+            ('Commodities', ('commodit', 'gold', 'silver', 'oil'), None),
+            ('Indices', ('indices', 'index', 's&p', 'ftse', 'dow'), None),
+            ('Stocks', ('stock', 'share', 'equit'), None),
+            ('Crypto', ('crypto', 'bitcoin', 'ethereum'), None),
+        ]
+        # Literals each value regex needs before it can match
+        self._leverage_terms = ('leverage',)
+        self._spread_terms = ('spread', 'pip')
+        self._commission_terms = ('commission', '%')
+        self._deposit_terms = ('minimum deposit', '$')
+        self._processing_time_terms = ('minute', 'hour', 'day')
+        # Matched against the original text: the captured unit keeps its casing
+        self._processing_time_re = re.compile(r'(\d+[-\s]?\d*)\s*(minute|hour|day|business day)', re.IGNORECASE)
+
+        # Every topic/category keyword and fact term, searched for in one pass per document
+        self._all_keywords = set(self._keyword_topics) | set(self._keyword_categories)
+        for specs in (self._account_type_terms, self._platform_terms, self._instrument_terms):
+            for _, terms, _ in specs:
+                self._all_keywords.update(terms)
+        self._all_keywords.update(
+            self._leverage_terms + self._spread_terms + self._commission_terms
+            + self._deposit_terms + self._processing_time_terms
+        )
+        self._keyword_automaton = None
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword in self._all_keywords:
+                self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+
+    def _build_noise_db(self):
+        """Compile the Hyperscan database of literal noise patterns (if available)
+        
+        One scan over it tells clean_text which of them occur at all. Real
+        regexes are always run by re: Hyperscan's classes (\\s, \\d, ...) and
+        case folding are ASCII-only and would miss matches that re finds.
+        """
+        self._noise_db = None
+        self._noise_scratch = None
+        literal_ids = [i for i, literal in enumerate(self._noise_literals) if literal is not None]
+        if hyperscan is not None and literal_ids:
+            self._noise_db = hyperscan.Database()
+            self._noise_db.compile(
+                expressions=[re.escape(self._noise_literals[i]).encode('utf-8') for i in literal_ids],
+                ids=literal_ids,
+                elements=len(literal_ids),
+                flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(literal_ids)
+            )
+            self._noise_scratch = hyperscan.Scratch(self._noise_db)
+    
+    def __getstate__(self):
+        # Hyperscan objects can't be pickled; they are rebuilt on unpickling
+        state = self.__dict__.copy()
+        state['_noise_db'] = state['_noise_scratch'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_noise_db()
     
     def log(self, message, level='INFO'):
         """Print formatted log message"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
+        timestamp = f"{time.monotonic() - self._t0:7.2f}s"
         prefix = {
             'INFO': '📝',
             'SUCCESS': '✅',
@@ -178,7 +475,18 @@ class HantecProductionCleaner:
             'ERROR': '❌',
             'PROCESSING': '🔄'
         }.get(level, '•')
-        print(f"[{timestamp}] {prefix} {message}")
+        self._log_buf.append(f"[{timestamp}] {prefix} {message}\n")
+        if self._log_flush_every is None:
+            return
+        if level in ('WARNING', 'ERROR') or len(self._log_buf) >= self._log_flush_every:
+            self.flush_log()
+    
+    def flush_log(self):
+        """Write buffered log lines to stdout in one call"""
+        if self._log_buf:
+            sys.stdout.write(''.join(self._log_buf))
+            sys.stdout.flush()
+            self._log_buf.clear()
     
     def clean_text(self, text):
         """
@@ -192,57 +500,59 @@ class HantecProductionCleaner:
         """
         original_length = len(text)
         
-        # Step 1: Mark important content to preserve
-        preserved_sections = []
-        for pattern in self.preserve_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                preserved_sections.append(match.group(0))
+        # Step 1: Mark important content to preserve (lowercased once, NUL-separated
+        # so a noise pattern can only match inside a single preserved section)
+        preserved_text = '\0'.join([
+            match.group(0)
+            for pattern_re in self._preserve_re
+            for match in pattern_re.finditer(text)
+        ]).lower()
         
         # Step 2: Remove SOURCE line (we'll add it back structured)
-        text = re.sub(r'^SOURCE:.*?\n={80}\n\n', '', text, flags=re.MULTILINE)
+        text = self._source_line_re.sub('', text)
         
         # Step 3: Remove excessive whitespace
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r' {2,}', ' ', text)
+        text = self._newlines_re.sub('\n\n', text)
+        text = self._spaces_re.sub(' ', text)
         
         # Step 4: Remove noise patterns (only if not part of preserved content)
-        for pattern in self.noise_patterns:
+        present = self.find_noise(text)
+        for i, (pattern_lower, pattern_re) in enumerate(zip(self._noise_lower, self._noise_re)):
+            if i not in present:
+                continue
             # Check if pattern overlaps with preserved content
-            if not any(pattern.lower() in preserved.lower() for preserved in preserved_sections):
-                text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Step 5: Remove trade signal spam
-        text = re.sub(r'(PREMIUM|INTRADAY|BUY LIMIT|SELL LIMIT|LIVE TRADE)\s*\n', '', text)
-        text = re.sub(r'(Entry|Target|Stop|Confidence|Expires)\s*\n', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'To unlock this trade idea.*?account\.', '', text, flags=re.DOTALL)
-        text = re.sub(r'\d+h \d+m', '', text)  # Time stamps
-        
-        # Step 6: Remove repeated dashes/equals (but keep section dividers)
-        text = re.sub(r'[-]{10,}', '', text)
-        text = re.sub(r'[=]{10,}(?!\n)', '', text)  # Keep if followed by newline
-        
-        # Step 7: Clean up lines
-        lines = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if line and len(line) > 1:  # Keep lines with actual content
-                lines.append(line)
-        
-        text = '\n'.join(lines)
-        
-        # Step 8: Add structure to section headers
-        for header in self.section_headers:
-            if header in text:
-                text = text.replace(header, f'\n## {header}\n')
-        
-        # Step 9: Remove duplicate lines (common in footers)
+            if pattern_lower not in preserved_text:
+                text, removed = pattern_re.subn('', text)
+                if removed:
+                    # Removal can join text into new matches, so look again
+                    present = self.find_noise(text)
+        
+        # Step 5-6: Remove trade signal spam and repeated dashes/equals (but keep
+        # section dividers)
+        for removal_re in self._removal_res:
+            text = removal_re.sub('', text)
+        
+        # Step 7-9: Clean up lines, add structure to section headers and remove
+        # duplicate lines (common in footers) in a single walk over the lines
         seen_lines = set()
+        seen_add = seen_lines.add  # set.add returns None, so `not seen_add(line)` is True
         unique_lines = []
-        for line in text.split('\n'):
-            if line not in seen_lines or len(line) > 100:  # Keep long lines even if duplicate
-                seen_lines.add(line)
-                unique_lines.append(line)
+        append = unique_lines.append
+        header_search = self._header_re.search
+        for line in map(str.strip, text.split('\n')):
+            if len(line) <= 1:  # Keep lines with actual content
+                continue
+            
+            if header_search(line):
+                for header in self.section_headers:
+                    if header in line:
+                        line = line.replace(header, f'\n## {header}\n')
+                for piece in line.split('\n'):
+                    if len(piece) > 100 or (piece not in seen_lines and not seen_add(piece)):
+                        append(piece)
+            # Keep long lines even if duplicate
+            elif len(line) > 100 or (line not in seen_lines and not seen_add(line)):
+                append(line)
         
         text = '\n'.join(unique_lines)
         
@@ -253,8 +563,40 @@ class HantecProductionCleaner:
         
         return text.strip(), retention
     
-    def extract_metadata(self, text, filename):
+    def find_noise(self, text):
+        """Return indices of noise patterns that may occur in text
+        
+        Literal patterns are checked against a case-folded copy (one Hyperscan
+        scan when available, else substring checks); real regexes are always
+        reported.
+        """
+        text_lower = _fold_caseless(text)
+        if self._noise_db is not None:
+            present = set(self._noise_regex_ids)
+            
+            def on_match(pattern_id, start, end, flags, context):
+                present.add(pattern_id)
+            
+            self._noise_db.scan(text_lower.encode('utf-8'), match_event_handler=on_match, scratch=self._noise_scratch)
+            return present
+        
+        return {
+            i for i, literal in enumerate(self._noise_literals)
+            if literal is None or literal in text_lower
+        }
+    
+    def find_keywords(self, text_lower):
+        """Return the set of keywords and fact terms occurring in lowercased text"""
+        if self._keyword_automaton is not None:
+            return {keyword for _, keyword in self._keyword_automaton.iter(text_lower)}
+        return {keyword for keyword in self._all_keywords if keyword in text_lower}
+    
+    def extract_metadata(self, text, filename, text_lower=None, found=None):
         """Extract comprehensive metadata for RAG optimization"""
+        if text_lower is None:
+            text_lower = _fold_caseless(text)
+        if found is None:
+            found = self.find_keywords(text_lower)
         
         # Basic metrics
         words = text.split()
@@ -262,16 +604,16 @@ class HantecProductionCleaner:
         char_count = len(text)
         
         # Content type detection
-        has_numbers = bool(re.search(r'\d+', text))
-        has_pricing = bool(re.search(r'(\$|commission|spread|fee|cost|charge)', text, re.IGNORECASE))
-        has_contact = bool(re.search(r'(email|phone|contact|@|\+\d+)', text, re.IGNORECASE))
-        has_regulatory = bool(re.search(r'(FCA|FSC|ASIC|VFSC|regulat|licens|complian)', text, re.IGNORECASE))
-        has_tutorial = bool(re.search(r'(how to|step|guide|tutorial|learn)', text, re.IGNORECASE))
+        has_numbers = bool(self._has_numbers_re.search(text))
+        has_pricing = bool(self._has_pricing_re.search(text_lower))
+        has_contact = bool(self._has_contact_re.search(text_lower))
+        has_regulatory = bool(self._has_regulatory_re.search(text_lower))
+        has_tutorial = bool(self._has_tutorial_re.search(text_lower))
         
         # Entity extraction
-        emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-        phones = re.findall(r'\+?\d{1,3}[-\s]?\d{2,3}[-\s]?\d{3,4}[-\s]?\d{3,4}', text)
-        urls = re.findall(r'https?://[^\s]+', text)
+        emails = self._email_re.findall(text)
+        phones = self._phone_re.findall(text)
+        urls = self._url_re.findall(text)
         
         # Complexity score (for multi-doc queries)
         complexity_score = 0
@@ -281,25 +623,15 @@ class HantecProductionCleaner:
         if has_tutorial: complexity_score += 1
         
         # Topic extraction (simple keyword-based)
-        topics = []
-        topic_keywords = {
-            'trading': ['trade', 'trading', 'trader', 'market'],
-            'platform': ['mt4', 'mt5', 'metatrader', 'platform', 'app'],
-            'account': ['account', 'registration', 'signup', 'demo', 'live'],
-            'product': ['forex', 'cfd', 'stock', 'crypto', 'commodity', 'index'],
-            'education': ['learn', 'guide', 'tutorial', 'education', 'course'],
-            'regulation': ['fca', 'fsc', 'regulated', 'license', 'compliant'],
-            'payment': ['deposit', 'withdraw', 'payment', 'fund', 'transfer'],
-        }
-        
-        text_lower = text.lower()
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                topics.append(topic)
+        matched_topics = set()
+        for keyword in found:
+            matched_topics.update(self._keyword_topics.get(keyword, ()))
+        topics = [topic for topic in self.topic_keywords if topic in matched_topics]
         
         metadata = {
             'filename': filename,
             'word_count': word_count,
+            'word_count_str': f"{word_count:,}",  # formatted once, for the master index
             'char_count': char_count,
             'has_numbers': has_numbers,
             'has_pricing': has_pricing,
@@ -311,81 +643,46 @@ class HantecProductionCleaner:
             'urls': urls,
             'complexity_score': complexity_score,
             'topics': topics,
-            'processing_timestamp': datetime.now().isoformat()
+            'processing_timestamp': self._run_ts
         }
         
         return metadata
     
-    def categorize_content(self, filename, text, metadata):
+    def categorize_content(self, filename, text, metadata, text_lower=None, found=None):
         """
         Advanced categorization using filename, content, and metadata
         
         Handles edge cases and mixed content
         """
         filename_lower = filename.lower()
-        text_lower = text.lower()
-        
-        # Category keyword dictionary (expanded)
-        category_keywords = {
-            'platforms': {
-                'keywords': ['mt4', 'mt5', 'metatrader', 'webtrader', 'platform', 'app', 'mobile', 'client portal', 'trading terminal'],
-                'weight': 1.0
-            },
-            'products': {
-                'keywords': ['forex', 'cfd', 'commodit', 'indices', 'stock', 'crypto', 'bullion', 'metal', 'currency', 'etf', 'pairs', 'instrument'],
-                'weight': 1.0
-            },
-            'education': {
-                'keywords': ['learn', 'education', 'guide', 'tutorial', 'hub', 'glossary', 'macro', 'risk management', 'strategy', 'indicator', 'analysis'],
-                'weight': 1.0
-            },
-            'accounts': {
-                'keywords': ['account', 'global', 'pro', 'cent', 'demo', 'registration', 'signup', 'live account'],
-                'weight': 1.0
-            },
-            'tools': {
-                'keywords': ['calculator', 'tool', 'calendar', 'economic', 'signal', 'analysis', 'terminal', 'widget'],
-                'weight': 0.8
-            },
-            'about': {
-                'keywords': ['about', 'company', 'contact', 'sponsor', 'atletico', 'fortaleza', 'team', 'office'],
-                'weight': 0.7
-            },
-            'support': {
-                'keywords': ['help', 'faq', 'support', 'question', 'how to', 'how-to'],
-                'weight': 0.9
-            },
-            'legal': {
-                'keywords': ['legal', 'terms', 'condition', 'policy', 'privacy', 'compliance', 'regulation', 'bonus', 'offer'],
-                'weight': 0.8
-            },
-            'funding': {
-                'keywords': ['deposit', 'withdraw', 'funding', 'payment', 'bank', 'transfer', 'method'],
-                'weight': 1.0
-            },
-            'partners': {
-                'keywords': ['partner', 'ib', 'affiliate', 'pamm', 'introducing broker', 'commission'],
-                'weight': 0.8
-            },
-            'blog': {
-                'keywords': ['blog/', 'article', 'news', 'insight'],
-                'weight': 0.5
-            },
-        }
+        if text_lower is None:
+            text_lower = _fold_caseless(text)
+        if found is None:
+            found = self.find_keywords(text_lower)
+        
+        # Count keyword hits per category through the reverse index
+        filename_hits = defaultdict(int)
+        for keyword in self.find_keywords(filename_lower):
+            for category in self._keyword_categories.get(keyword, ()):
+                filename_hits[category] += 1
+        content_hits = defaultdict(int)
+        for keyword in found:
+            for category in self._keyword_categories.get(keyword, ()):
+                content_hits[category] += 1
         
         # Score each category
         category_scores = {}
         
-        for category, config in category_keywords.items():
+        for category, config in self.category_keywords.items():
             score = 0
             keywords = config['keywords']
             weight = config['weight']
             
             # Check filename (higher weight)
-            filename_matches = sum(2 for keyword in keywords if keyword in filename_lower)
+            filename_matches = 2 * filename_hits[category]
             
             # Check content
-            content_matches = sum(1 for keyword in keywords if keyword in text_lower)
+            content_matches = content_hits[category]
             
             # Check metadata topics
             topic_matches = sum(1 for topic in metadata['topics'] if topic in keywords or category in topic)
@@ -404,12 +701,15 @@ class HantecProductionCleaner:
         # Default to general if no clear category
         return 'general'
     
-    def extract_key_facts(self, text):
+    def extract_key_facts(self, text, text_lower=None, found=None):
         """
         Extract key facts and data points for quick reference
         
         Includes cross-references for multi-doc queries
         """
+        if text_lower is None:
+            text_lower = _fold_caseless(text)
+        
         facts = {
             'leverage': [],
             'spreads': [],
@@ -423,103 +723,106 @@ class HantecProductionCleaner:
             'processing_times': [],
         }
         
+        # The keyword pass decides which of the scans below can match at all
+        if found is None:
+            found = self.find_keywords(text_lower)
+        
         # Leverage
-        leverage_matches = re.findall(r'(\d+:\d+)\s*leverage', text, re.IGNORECASE)
-        facts['leverage'] = list(set(leverage_matches))
+        if found.issuperset(self._leverage_terms):
+            leverage_matches = self._leverage_re.findall(text_lower)
+            facts['leverage'] = list(dict.fromkeys(leverage_matches))
         
         # Spreads
-        spread_matches = re.findall(r'spread.*?(\d+\.?\d*)\s*pip', text, re.IGNORECASE)
-        facts['spreads'] = list(set([m for m in spread_matches]))
+        if found.issuperset(self._spread_terms):
+            spread_matches = self._spread_re.findall(text_lower)
+            facts['spreads'] = list(dict.fromkeys(spread_matches))
         
         # Commissions
-        commission_matches = re.findall(r'commission.*?(\d+\.?\d*)\s*%', text, re.IGNORECASE)
-        facts['commissions'] = list(set([m for m in commission_matches]))
+        if found.issuperset(self._commission_terms):
+            commission_matches = self._commission_re.findall(text_lower)
+            facts['commissions'] = list(dict.fromkeys(commission_matches))
         
         # Minimum deposits
-        deposit_matches = re.findall(r'minimum deposit.*?\$(\d+)', text, re.IGNORECASE)
-        facts['minimum_deposits'] = list(set([f"${m}" for m in deposit_matches]))
+        if found.issuperset(self._deposit_terms):
+            deposit_matches = self._deposit_re.findall(text_lower)
+            facts['minimum_deposits'] = list(dict.fromkeys(f"${m}" for m in deposit_matches))
         
         # Regulations
-        reg_matches = re.findall(r'(FCA|FSC|ASIC|CySEC|VFSC|FSA)', text, re.IGNORECASE)
-        facts['regulations'] = list(set([r.upper() for r in reg_matches]))
-        
-        # Account types
-        account_types = []
-        if re.search(r'hantec global', text, re.IGNORECASE):
-            account_types.append('Hantec Global')
-        if re.search(r'hantec pro', text, re.IGNORECASE):
-            account_types.append('Hantec Pro')
-        if re.search(r'hantec cent', text, re.IGNORECASE):
-            account_types.append('Hantec Cent')
-        facts['account_types'] = account_types
-        
-        # Platforms
-        platforms = []
-        if re.search(r'\bMT4\b|MetaTrader 4', text, re.IGNORECASE):
-            platforms.append('MT4')
-        if re.search(r'\bMT5\b|MetaTrader 5', text, re.IGNORECASE):
-            platforms.append('MT5')
-        if re.search(r'hantec social', text, re.IGNORECASE):
-            platforms.append('Hantec Social')
-        if re.search(r'mobile app', text, re.IGNORECASE):
-            platforms.append('Mobile App')
-        if re.search(r'webtrader', text, re.IGNORECASE):
-            platforms.append('WebTrader')
-        facts['platforms'] = platforms
-        
-        # Instruments
-        instruments = []
-        instrument_keywords = {
-            'Forex': r'forex|currency pair|fx',
-            'CFDs': r'\bcfd\b',
-            'Commodities': r'commodit|gold|silver|oil',
-            'Indices': r'indices|index|S&P|FTSE|Dow',
-            'Stocks': r'stock|share|equit',
-            'Crypto': r'crypto|bitcoin|ethereum'
-        }
-        for instrument, pattern in instrument_keywords.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                instruments.append(instrument)
-        facts['instruments'] = instruments
+        reg_matches = self._regulation_re.findall(text_lower)
+        facts['regulations'] = list(dict.fromkeys(r.upper() for r in reg_matches))
+        
+        # Account types, platforms and instruments
+        facts['account_types'] = self._present_names(self._account_type_terms, found, text_lower)
+        facts['platforms'] = self._present_names(self._platform_terms, found, text_lower)
+        facts['instruments'] = self._present_names(self._instrument_terms, found, text_lower)
         
         # Contact info
-        emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-        phones = re.findall(r'\+?\d{1,3}[-\s]?\d{2,3}[-\s]?\d{3,4}[-\s]?\d{3,4}', text)
-        facts['contact_info'] = list(set(emails + phones))
+        emails = self._email_re.findall(text)
+        phones = self._phone_re.findall(text)
+        facts['contact_info'] = list(dict.fromkeys(chain(emails, phones)))
         
         # Processing times
-        time_matches = re.findall(r'(\d+[-\s]?\d*)\s*(minute|hour|day|business day)', text, re.IGNORECASE)
-        facts['processing_times'] = [f"{m[0]} {m[1]}" for m in time_matches]
+        if not found.isdisjoint(self._processing_time_terms):
+            time_matches = self._processing_time_re.findall(text)
+            facts['processing_times'] = [f"{m[0]} {m[1]}" for m in time_matches]
         
         return facts
     
-    def identify_relationships(self, doc, all_docs):
+    @staticmethod
+    def _present_names(specs, found, text_lower):
+        """Names whose terms were found (and whose boundary regex, if any, matches)"""
+        return [
+            name for name, terms, pattern_re in specs
+            if not found.isdisjoint(terms) and (pattern_re is None or pattern_re.search(text_lower))
+        ]
+    
+    def relationship_features(self, docs):
+        """
+        Encode each document's topics and facts as integer bitsets
+        
+        Returns {id(doc): (topic_bits, fact_bits)}; one bit per distinct topic or
+        (fact key, value) pair, so pairwise overlap is a single AND + bit_count
+        """
+        bit_positions = {}
+        features = {}
+        for doc in docs:
+            topic_bits = 0
+            for topic in doc['metadata']['topics']:
+                topic_bits |= 1 << bit_positions.setdefault(('topic', topic), len(bit_positions))
+            fact_bits = 0
+            for key, values in doc['facts'].items():
+                for value in values:
+                    fact_bits |= 1 << bit_positions.setdefault((key, value), len(bit_positions))
+            features[id(doc)] = (topic_bits, fact_bits)
+        return features
+    
+    def identify_relationships(self, doc, all_docs, features=None):
         """
         Identify relationships between documents for multi-doc queries
         
+        features: optional relationship_features() covering doc and all_docs,
+        shared across calls so the bitsets are only built once
+        
         Returns list of related document IDs
         """
+        if features is None:
+            features = self.relationship_features([doc, *all_docs])
+        
         relationships = []
         
-        current_topics = set(doc['metadata']['topics'])
-        current_facts = doc['facts']
+        current_topics, current_facts = features[id(doc)]
         
         for other_doc in all_docs:
             if other_doc['filename'] == doc['filename']:
                 continue
             
-            other_topics = set(other_doc['metadata']['topics'])
-            other_facts = other_doc['facts']
+            other_topics, other_facts = features[id(other_doc)]
             
             # Topic overlap
-            topic_overlap = len(current_topics & other_topics)
+            topic_overlap = (current_topics & other_topics).bit_count()
             
             # Fact overlap (e.g., both mention same platforms)
-            fact_overlap = 0
-            for key in current_facts:
-                if current_facts[key] and other_facts[key]:
-                    common = set(current_facts[key]) & set(other_facts[key])
-                    fact_overlap += len(common)
+            fact_overlap = (current_facts & other_facts).bit_count()
             
             # If significant overlap, mark as related
             if topic_overlap >= 2 or fact_overlap >= 1:
@@ -529,10 +832,53 @@ class HantecProductionCleaner:
                     'strength': topic_overlap + fact_overlap
                 })
         
-        # Sort by strength
-        relationships.sort(key=lambda x: x['strength'], reverse=True)
+        # Top 5 related docs by strength
+        return heapq.nlargest(5, relationships, key=lambda x: x['strength'])
+    
+    def identify_all_relationships(self, docs):
+        """
+        identify_relationships() for every document at once
         
-        return relationships[:5]  # Top 5 related docs
+        Overlap is symmetric, so each pair is scored once and recorded on both
+        sides. Returns {filename: top 5 related documents}, same as calling
+        identify_relationships(doc, docs) per document
+        """
+        features = self.relationship_features(docs)
+        bits = [features[id(doc)] for doc in docs]
+        
+        # Per document, a min-heap of its 5 best (strength, -other index, type).
+        # Pairs arrive in ascending order of the other document, so a tie never
+        # displaces an earlier document, matching nlargest's stable tie order
+        top = [[] for _ in docs]
+        
+        for i, (topics_i, facts_i) in enumerate(bits):
+            top_i = top[i]
+            for j in range(i + 1, len(docs)):
+                topics_j, facts_j = bits[j]
+                topic_overlap = (topics_i & topics_j).bit_count()
+                fact_overlap = (facts_i & facts_j).bit_count()
+                
+                if topic_overlap >= 2 or fact_overlap >= 1:
+                    relationship_type = 'topic' if topic_overlap > fact_overlap else 'fact'
+                    strength = topic_overlap + fact_overlap
+                    for heap, other in ((top_i, j), (top[j], i)):
+                        entry = (strength, -other, relationship_type)
+                        if len(heap) < 5:
+                            heapq.heappush(heap, entry)
+                        elif entry > heap[0]:
+                            heapq.heapreplace(heap, entry)
+        
+        return {
+            doc['filename']: [
+                {
+                    'related_doc': docs[-neg_other]['filename'],
+                    'relationship_type': relationship_type,
+                    'strength': strength
+                }
+                for strength, neg_other, relationship_type in sorted(heap, reverse=True)
+            ]
+            for doc, heap in zip(docs, top)
+        }
     
     def structure_content(self, text, metadata, facts):
         """Add structured headers and sections for RAG optimization"""
@@ -578,75 +924,155 @@ class HantecProductionCleaner:
         
         return '\n'.join(structured)
     
+    def cache_fingerprint(self):
+        """Digest of this cleaner's class and pattern/keyword config, part of every cache key
+        
+        A subclass, or an instance with its own patterns, never reuses
+        documents cached by a differently configured cleaner
+        """
+        if self._cache_fingerprint is None:
+            cls = type(self)
+            config = repr((
+                self.noise_patterns, self.preserve_patterns, self.section_headers,
+                self.topic_keywords, self.category_keywords,
+            ))
+            self._cache_fingerprint = hashlib.sha256(
+                _PIPELINE_FINGERPRINT
+                + f"{cls.__module__}.{cls.__qualname__}".encode('utf-8') + b'\0'
+                + config.encode('utf-8')
+            ).digest()
+        return self._cache_fingerprint
+    
+    def cache_file(self, filename, raw_bytes):
+        """Cache path for a processed document (None if caching is disabled)"""
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(self.cache_fingerprint() + filename.encode('utf-8') + b'\0' + raw_bytes).hexdigest()
+        return self.cache_dir / f"{key}.pkl"
+    
+    def build_document(self, filename, raw_text):
+        """Clean, analyze and structure one raw document (None if too short)"""
+        # Extract source URL
+        source_url = ''
+        source_match = self._source_url_re.search(raw_text)
+        if source_match:
+            source_url = source_match.group(1)
+        
+        # Clean text
+        cleaned_text, retention = self.clean_text(raw_text)
+        
+        if len(cleaned_text) < 100:
+            self.log(f"  ⚠️  Skipped (too short: {len(cleaned_text)} chars)", 'WARNING')
+            return None
+        
+        # Case-folded and keyword-scanned once, shared by metadata, categorization and facts
+        text_lower = _fold_caseless(cleaned_text)
+        found = self.find_keywords(text_lower)
+        
+        # Extract metadata
+        metadata = self.extract_metadata(cleaned_text, filename, text_lower, found)
+        
+        # Categorize
+        category = self.categorize_content(filename, cleaned_text, metadata, text_lower, found)
+        
+        # Extract facts
+        facts = self.extract_key_facts(cleaned_text, text_lower, found)
+        
+        # Structure content
+        structured_text = self.structure_content(cleaned_text, metadata, facts)
+        
+        # Add source URL
+        if source_url:
+            structured_text = f"SOURCE: {source_url}\n{'='*80}\n\n{structured_text}"
+        
+        return {
+            'filename': filename,
+            'category': category,
+            'content': structured_text,
+            'metadata': metadata,
+            'facts': facts,
+            'source_url': source_url,
+            'retention': retention
+        }
+    
     def process_file(self, filepath):
         """Process a single file with comprehensive logging"""
-        filename = os.path.basename(filepath)
+        filepath = Path(filepath)
+        filename = filepath.name
         
         self.log(f"Processing: {filename}", 'PROCESSING')
         
         try:
-            # Read file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                raw_text = f.read()
+            # Read file (bytes for the cache key; text with universal newlines,
+            # as read_text would give)
+            raw_bytes = filepath.read_bytes()
+            raw_text = raw_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
             
             input_length = len(raw_text)
             self.metrics['total_input_chars'] += input_length
             
-            # Extract source URL
-            source_url = ''
-            source_match = re.search(r'SOURCE:\s*(https?://[^\n]+)', raw_text)
-            if source_match:
-                source_url = source_match.group(1)
+            # Reuse an earlier run's result if this exact file was already processed
+            cache_file = self.cache_file(filename, raw_bytes)
+            if cache_file is not None and cache_file.exists():
+                result = pickle.loads(cache_file.read_bytes())
+                cache_file.touch()  # Mark as still in use (see prune_cache)
+                if result is None:
+                    self.log("  ⚠️  Skipped (too short, cached)", 'WARNING')
+            else:
+                result = self.build_document(filename, raw_text)
+                if cache_file is not None:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    _write_atomic(cache_file, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
             
-            # Clean text
-            cleaned_text, retention = self.clean_text(raw_text)
-            
-            if len(cleaned_text) < 100:
-                self.log(f"  ⚠️  Skipped (too short: {len(cleaned_text)} chars)", 'WARNING')
+            if result is None:
                 self.metrics['failed_files'] += 1
                 return None
             
-            output_length = len(cleaned_text)
+            output_length = result['metadata']['char_count']
             self.metrics['total_output_chars'] += output_length
             
-            # Extract metadata
-            metadata = self.extract_metadata(cleaned_text, filename)
-            
-            # Categorize
-            category = self.categorize_content(filename, cleaned_text, metadata)
-            
-            # Extract facts
-            facts = self.extract_key_facts(cleaned_text)
-            
-            # Structure content
-            structured_text = self.structure_content(cleaned_text, metadata, facts)
-            
-            # Add source URL
-            if source_url:
-                structured_text = f"SOURCE: {source_url}\n{'='*80}\n\n{structured_text}"
-            
-            self.log(f"  ✅ Category: {category} | Words: {metadata['word_count']} | Retention: {retention:.1f}%", 'SUCCESS')
+            self.log(f"  ✅ Category: {result['category']} | Words: {result['metadata']['word_count']} | Retention: {result['retention']:.1f}%", 'SUCCESS')
             
             self.metrics['processed_files'] += 1
             
-            return {
-                'filename': filename,
-                'category': category,
-                'content': structured_text,
-                'metadata': metadata,
-                'facts': facts,
-                'source_url': source_url,
-                'retention': retention
-            }
+            return result
             
         except Exception as e:
             self.log(f"  ❌ Error: {str(e)[:100]}", 'ERROR')
             self.metrics['failed_files'] += 1
             return None
     
+    def add_document(self, doc):
+        """Record a processed document and fold its facts into consolidated_facts"""
+        self.processed_docs.append(doc)
+        facts = doc['facts']
+        for key, values in self.consolidated_facts.items():
+            if key in facts:
+                values.update(facts[key])
+    
+    def mark_cache_run(self):
+        """Touch the cache's run marker and return its mtime (None if caching is disabled)
+        
+        Uses the filesystem's own clock so it compares cleanly with cache file mtimes.
+        """
+        if self.cache_dir is None:
+            return None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        marker = self.cache_dir / '.last_run'
+        marker.touch()
+        return marker.stat().st_mtime
+    
+    def prune_cache(self, since):
+        """Delete cached documents not used since the given wall-clock time"""
+        if since is None or not self.cache_dir.exists():
+            return
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            if cache_file.stat().st_mtime < since:
+                cache_file.unlink()
+    
     def save_brand_guidelines(self):
         """Save brand guidelines document"""
-        guidelines_file = f"{self.output_dir}/BRAND_GUIDELINES.md"
+        guidelines_file = self.output_dir / "BRAND_GUIDELINES.md"
         
         content = f"""# HANTEC MARKETS - BRAND GUIDELINES
 
@@ -702,8 +1128,7 @@ When generating responses:
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
         
-        with open(guidelines_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        _write_atomic(guidelines_file, content.encode('utf-8'))
         
         self.log("Brand guidelines saved", 'SUCCESS')
     
@@ -713,7 +1138,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         self.log("\n💾 Saving results...", 'INFO')
         
         # Create output directory
-        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Group by category
         for doc in self.processed_docs:
@@ -727,26 +1152,29 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             if not docs:
                 continue
             
-            filename = f"{self.output_dir}/{category}.txt"
+            filename = self.output_dir / f"{category}.txt"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                # Category header
-                total_words = sum(d['metadata']['word_count'] for d in docs)
-                f.write(f"# {category.upper()} - HANTEC MARKETS\n")
-                f.write(f"# Total Documents: {len(docs)}\n")
-                f.write(f"# Total Words: {total_words:,}\n")
-                f.write(f"# Average Retention: {sum(d['retention'] for d in docs)/len(docs):.1f}%\n")
-                f.write("="*80 + "\n\n")
-                
-                # Write each document
-                for doc in docs:
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"DOCUMENT: {doc['filename']}\n")
-                    f.write(f"{'='*80}\n\n")
-                    f.write(doc['content'])
-                    f.write("\n\n")
-            
-            file_size = os.path.getsize(filename) / 1024
+            # Category header
+            total_words = sum(d['metadata']['word_count'] for d in docs)
+            parts = [
+                f"# {category.upper()} - HANTEC MARKETS\n"
+                f"# Total Documents: {len(docs)}\n"
+                f"# Total Words: {total_words:,}\n"
+                f"# Average Retention: {sum(d['retention'] for d in docs)/len(docs):.1f}%\n"
+                + "="*80 + "\n\n"
+            ]
+            
+            # Each document
+            parts.extend(
+                f"\n{'='*80}\nDOCUMENT: {doc['filename']}\n{'='*80}\n\n{doc['content']}\n\n"
+                for doc in docs
+            )
+            
+            # Built in memory, written in one call and renamed into place
+            data = ''.join(parts).encode('utf-8')
+            _write_atomic(filename, data)
+            
+            file_size = len(data) / 1024
             self.log(f"  ✅ {category}.txt - {len(docs)} docs ({file_size:.1f} KB)", 'SUCCESS')
         
         # Save master index
@@ -766,80 +1194,69 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     
     def save_master_index(self):
         """Save comprehensive master index"""
-        index_file = f"{self.output_dir}/_master_index.txt"
-        
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write("# HANTEC MARKETS - MASTER INDEX\n")
-            f.write(f"# Total Documents: {self.metrics['processed_files']}\n")
-            f.write(f"# Total Words: {sum(d['metadata']['word_count'] for d in self.processed_docs if d):,}\n")
-            f.write(f"# Categories: {self.metrics['categories_created']}\n")
-            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("="*80 + "\n\n")
-            
-            # Table of contents
-            f.write("## TABLE OF CONTENTS\n\n")
-            for category, docs in sorted(self.categories.items()):
-                if docs:
-                    f.write(f"- {category.upper()} ({len(docs)} documents)\n")
-            f.write("\n" + "="*80 + "\n")
-            
-            # Detailed listing by category
-            for category, docs in sorted(self.categories.items()):
-                if not docs:
-                    continue
+        index_file = self.output_dir / "_master_index.txt"
+        
+        # Bound once: sorted a single time and shared by both listings below
+        metrics = self.metrics
+        categories = [(category, docs) for category, docs in sorted(self.categories.items()) if docs]
+        
+        out = [
+            "# HANTEC MARKETS - MASTER INDEX\n"
+            f"# Total Documents: {metrics['processed_files']}\n"
+            f"# Total Words: {sum(d['metadata']['word_count'] for d in self.processed_docs if d):,}\n"
+            f"# Categories: {metrics['categories_created']}\n"
+            f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            + "="*80 + "\n\n"
+        ]
+        
+        # Table of contents
+        out.append("## TABLE OF CONTENTS\n\n")
+        for category, docs in categories:
+            out.append(f"- {category.upper()} ({len(docs)} documents)\n")
+        out.append("\n" + "="*80 + "\n")
+        
+        # Detailed listing by category
+        out_append = out.append
+        for category, docs in categories:
+            out_append(f"\n## {category.upper()} ({len(docs)} documents)\n" + "-"*80 + "\n")
+            
+            for doc in docs:
+                metadata = doc['metadata']
+                facts = doc['facts']
                 
-                f.write(f"\n## {category.upper()} ({len(docs)} documents)\n")
-                f.write("-"*80 + "\n")
+                # Key facts summary
+                key_info = ''
+                if any(facts.values()):
+                    info_parts = []
+                    if facts['leverage']:
+                        info_parts.append(f"Leverage: {', '.join(facts['leverage'])}")
+                    if facts['regulations']:
+                        info_parts.append(f"Regulations: {', '.join(facts['regulations'])}")
+                    if facts['platforms']:
+                        info_parts.append(f"Platforms: {', '.join(facts['platforms'])}")
+                    key_info = f"**Key Info:** {', '.join(info_parts)}\n"
                 
-                for doc in docs:
-                    f.write(f"\n### {doc['filename']}\n")
-                    f.write(f"**Source:** {doc['source_url']}\n")
-                    f.write(f"**Words:** {doc['metadata']['word_count']:,}\n")
-                    f.write(f"**Topics:** {', '.join(doc['metadata']['topics'])}\n")
-                    f.write(f"**Complexity:** {doc['metadata']['complexity_score']}/4\n")
-                    
-                    # Key facts summary
-                    if any(doc['facts'].values()):
-                        f.write("**Key Info:** ")
-                        info_parts = []
-                        if doc['facts']['leverage']:
-                            info_parts.append(f"Leverage: {', '.join(doc['facts']['leverage'])}")
-                        if doc['facts']['regulations']:
-                            info_parts.append(f"Regulations: {', '.join(doc['facts']['regulations'])}")
-                        if doc['facts']['platforms']:
-                            info_parts.append(f"Platforms: {', '.join(doc['facts']['platforms'])}")
-                        f.write(', '.join(info_parts) + "\n")
-                    
-                    f.write("\n")
+                # Whole entry in one string
+                out_append(
+                    f"\n### {doc['filename']}\n"
+                    f"**Source:** {doc['source_url']}\n"
+                    f"**Words:** {metadata['word_count_str']}\n"
+                    f"**Topics:** {', '.join(metadata['topics'])}\n"
+                    f"**Complexity:** {metadata['complexity_score']}/4\n"
+                    f"{key_info}\n"
+                )
+        
+        # Built in memory, written in one call and renamed into place
+        _write_atomic(index_file, ''.join(out).encode('utf-8'))
         
         self.log("Master index saved", 'SUCCESS')
     
     def save_quick_facts(self):
         """Save consolidated quick facts JSON"""
-        facts_file = f"{self.output_dir}/_quick_facts.json"
+        facts_file = self.output_dir / "_quick_facts.json"
         
-        consolidated_facts = {
-            'leverage_options': set(),
-            'spreads': set(),
-            'commissions': set(),
-            'minimum_deposits': set(),
-            'regulations': set(),
-            'account_types': set(),
-            'platforms': set(),
-            'instruments': set(),
-            'contact_info': set(),
-        }
-        
-        for doc in self.processed_docs:
-            if not doc:
-                continue
-            
-            for key in consolidated_facts:
-                if key in doc['facts']:
-                    consolidated_facts[key].update(doc['facts'][key])
-        
-        # Convert sets to sorted lists
-        facts_json = {k: sorted(list(v)) for k, v in consolidated_facts.items()}
+        # Sets were filled in as documents were added
+        facts_json = {key: sorted(values) for key, values in self.consolidated_facts.items()}
         
         # Add metadata
         facts_json['_metadata'] = {
@@ -848,8 +1265,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             'categories': list(self.categories.keys())
         }
         
-        with open(facts_file, 'w', encoding='utf-8') as f:
-            json.dump(facts_json, f, indent=2)
+        _write_atomic(facts_file, _json_bytes(facts_json))
         
         self.log("Quick facts JSON saved", 'SUCCESS')
     
@@ -857,52 +1273,57 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         """Save document relationship map for multi-doc queries"""
         
         # First, identify all relationships
-        for doc in self.processed_docs:
-            if doc:
-                relationships = self.identify_relationships(doc, self.processed_docs)
-                self.doc_relationships[doc['filename']] = relationships
+        docs = [doc for doc in self.processed_docs if doc]
+        self.doc_relationships = self.identify_all_relationships(docs)
         
         # Save as JSON
-        relationships_file = f"{self.output_dir}/_document_relationships.json"
+        relationships_file = self.output_dir / "_document_relationships.json"
         
-        with open(relationships_file, 'w', encoding='utf-8') as f:
-            json.dump(self.doc_relationships, f, indent=2)
+        _write_atomic(relationships_file, _json_bytes(self.doc_relationships))
+        
+        # Same map as NDJSON, one document per line, for consumers that stream-parse
+        ndjson_file = self.output_dir / "_document_relationships.ndjson"
+        lines = [
+            _json_bytes({'doc': filename, 'rels': relationships}) + b'\n'
+            for filename, relationships in self.doc_relationships.items()
+        ]
+        _write_atomic(ndjson_file, b''.join(lines))
         
         self.log("Document relationships saved", 'SUCCESS')
     
     def save_quality_metrics(self):
         """Save quality metrics report"""
+        metrics = self.metrics
         
         # Calculate final metrics
-        if self.metrics['total_input_chars'] > 0:
-            self.metrics['info_coverage'] = (
-                self.metrics['total_output_chars'] / self.metrics['total_input_chars'] * 100
+        if metrics['total_input_chars'] > 0:
+            metrics['info_coverage'] = (
+                metrics['total_output_chars'] / metrics['total_input_chars'] * 100
             )
         
-        metrics_file = f"{self.output_dir}/_quality_metrics.json"
+        metrics_file = self.output_dir / "_quality_metrics.json"
         
         metrics_report = {
             'processing_summary': {
-                'total_files_found': self.metrics['total_files'],
-                'successfully_processed': self.metrics['processed_files'],
-                'failed_files': self.metrics['failed_files'],
-                'success_rate': f"{(self.metrics['processed_files']/self.metrics['total_files']*100):.1f}%" if self.metrics['total_files'] > 0 else 'N/A'
+                'total_files_found': metrics['total_files'],
+                'successfully_processed': metrics['processed_files'],
+                'failed_files': metrics['failed_files'],
+                'success_rate': f"{(metrics['processed_files']/metrics['total_files']*100):.1f}%" if metrics['total_files'] > 0 else 'N/A'
             },
             'content_metrics': {
-                'total_input_characters': self.metrics['total_input_chars'],
-                'total_output_characters': self.metrics['total_output_chars'],
-                'information_coverage': f"{self.metrics['info_coverage']:.1f}%",
-                'average_document_size': f"{self.metrics['total_output_chars']//self.metrics['processed_files']:,} chars" if self.metrics['processed_files'] > 0 else 'N/A'
+                'total_input_characters': metrics['total_input_chars'],
+                'total_output_characters': metrics['total_output_chars'],
+                'information_coverage': f"{metrics['info_coverage']:.1f}%",
+                'average_document_size': f"{metrics['total_output_chars']//metrics['processed_files']:,} chars" if metrics['processed_files'] > 0 else 'N/A'
             },
             'organization': {
-                'categories_created': self.metrics['categories_created'],
+                'categories_created': metrics['categories_created'],
                 'categories': list(self.categories.keys())
             },
             'timestamp': datetime.now().isoformat()
         }
         
-        with open(metrics_file, 'w', encoding='utf-8') as f:
-            json.dump(metrics_report, f, indent=2)
+        _write_atomic(metrics_file, _json_bytes(metrics_report, pretty=True))
         
         self.log("Quality metrics saved", 'SUCCESS')
     
@@ -917,14 +1338,14 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print("\n" + "="*80 + "\n")
         
         # Check input directory
-        input_path = Path(self.input_dir)
-        if not input_path.exists():
+        if not self.input_dir.exists():
             self.log(f"Input directory not found: {self.input_dir}", 'ERROR')
             self.log("Please create it and add your scraped .txt files", 'ERROR')
             return
         
-        # Get all files
-        txt_files = list(input_path.glob("*.txt"))
+        # Get all files (scandir entries carry name and type, no Path per entry)
+        with os.scandir(self.input_dir) as entries:
+            txt_files = [entry.path for entry in entries if entry.name.endswith('.txt') and entry.is_file()]
         self.metrics['total_files'] = len(txt_files)
         
         if not txt_files:
@@ -932,18 +1353,44 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             return
         
         self.log(f"Found {len(txt_files)} files to process\n", 'INFO')
+        run_started = self.mark_cache_run()
         
-        # Process each file
-        for i, filepath in enumerate(txt_files, 1):
-            self.log(f"[{i}/{len(txt_files)}]", 'INFO')
-            result = self.process_file(filepath)
-            if result:
-                self.processed_docs.append(result)
+        try:
+            # Process each file (files are independent, so fan out across CPUs)
+            if self.workers > 1:
+                with ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self,)
+                ) as executor:
+                    results = executor.map(_process_file_worker, txt_files, chunksize=4)
+                    for i, (result, file_metrics, log_lines) in enumerate(results, 1):
+                        # Worker lines follow this file's progress line, as in the sequential path
+                        self.log(f"[{i}/{len(txt_files)}]", 'INFO')
+                        self._log_buf.extend(log_lines)
+                        if len(self._log_buf) >= self._log_flush_every:
+                            self.flush_log()
+                        for key, value in file_metrics.items():
+                            self.metrics[key] += value
+                        if result:
+                            self.add_document(result)
+            else:
+                for i, filepath in enumerate(txt_files, 1):
+                    self.log(f"[{i}/{len(txt_files)}]", 'INFO')
+                    result = self.process_file(filepath)
+                    if result:
+                        self.add_document(result)
+            
+            # Drop cache entries for files that were removed or changed
+            self.prune_cache(run_started)
+            
+            # Save results
+            if self.processed_docs:
+                self.save_results()
+        finally:
+            self.flush_log()
         
-        # Save results
         if self.processed_docs:
-            self.save_results()
-            
             # Print summary
             print("\n" + "="*80)
             print("🎉 PROCESSING COMPLETE!")
@@ -961,6 +1408,36 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             self.log("No documents were processed successfully", 'ERROR')
 
 
+# Per-process cleaner used by the process pool in run()
+_worker_cleaner = None
+
+# Metrics that process_file increments and run() sums across workers
+_WORKER_METRICS = ('total_input_chars', 'total_output_chars', 'processed_files', 'failed_files')
+
+
+def _init_worker(cleaner):
+    """Pool initializer: install a copy of run()'s cleaner in this worker
+    
+    The copy keeps the cleaner's class, configuration and run clock, so
+    subclasses and tweaked patterns behave as in the sequential path.
+    """
+    global _worker_cleaner
+    _worker_cleaner = cleaner
+    _worker_cleaner.workers = 1
+    # Log lines are returned to run(), which prints them in file order
+    _worker_cleaner._log_buf = []
+    _worker_cleaner._log_flush_every = None
+
+
+def _process_file_worker(filepath):
+    """Process one file in a pool worker, returning (result, metric increments, log lines)"""
+    before = {key: _worker_cleaner.metrics[key] for key in _WORKER_METRICS}
+    result = _worker_cleaner.process_file(filepath)
+    log_lines = _worker_cleaner._log_buf[:]
+    _worker_cleaner._log_buf.clear()
+    return result, {key: _worker_cleaner.metrics[key] - before[key] for key in _WORKER_METRICS}, log_lines
+
+
 if __name__ == "__main__":
     cleaner = HantecProductionCleaner(
         input_dir="raw_scraped_data",
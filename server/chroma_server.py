@@ -1,13 +1,10 @@
 import chromadb
 from chromadb.config import Settings
 
-# Run ChromaDB server
-chroma_server = chromadb.HttpClient(
-    settings=Settings(
-        chroma_api_impl="chromadb.api.fastapi.FastAPI",
-        chroma_server_host="0.0.0.0",
-        chroma_server_http_port=8000
-    )
+# Open ChromaDB in-process (no HTTP round-trip per add/query)
+chroma_client = chromadb.PersistentClient(
+    path="data/chroma",
+    settings=Settings(anonymized_telemetry=False)
 )
 
-print("ChromaDB server running on http://localhost:8000")
\ No newline at end of file
+print("ChromaDB persistent store ready at data/chroma")